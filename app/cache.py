@@ -0,0 +1,30 @@
+import hashlib
+
+import diskcache
+
+# Entries expire after an hour, matching the in-process st.cache_data TTL
+CACHE_TTL = 3600
+
+cache = diskcache.Cache(".cache/cold_email")
+
+
+def _key(namespace, value):
+    return f"{namespace}:{hashlib.sha1(value.encode('utf-8')).hexdigest()}"
+
+
+# Scraped and cleaned page text, keyed by URL
+def get_page(url):
+    return cache.get(_key("page", url))
+
+
+def set_page(url, cleaned_text):
+    cache.set(_key("page", url), cleaned_text, expire=CACHE_TTL)
+
+
+# Extracted jobs, keyed by the cleaned text they were extracted from
+def get_jobs(cleaned_text):
+    return cache.get(_key("jobs", cleaned_text))
+
+
+def set_jobs(cleaned_text, jobs):
+    cache.set(_key("jobs", cleaned_text), jobs, expire=CACHE_TTL)
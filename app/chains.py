@@ -1,10 +1,39 @@
 import os
+import msgspec
 from langchain_ollama import ChatOllama
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.exceptions import OutputParserException
 
 
+class JobPosting(msgspec.Struct):
+    role: str = ""
+    experience: str = "N/A"
+    skills: list[str] = []
+    description: str = ""
+
+
+def to_job_postings(raw):
+    # LLM output is loosely typed: drop nulls, split comma-separated skills
+    # and stringify scalar fields before validating against JobPosting
+    jobs = []
+    for job in raw if isinstance(raw, list) else [raw]:
+        if not isinstance(job, dict):
+            continue
+        job = {key: value for key, value in job.items() if value is not None}
+        skills = job.get("skills", [])
+        if isinstance(skills, str):
+            skills = [skill.strip() for skill in skills.split(",") if skill.strip()]
+        elif not isinstance(skills, list):
+            skills = [skills]
+        job["skills"] = [str(skill) for skill in skills]
+        for key in ("role", "experience", "description"):
+            if key in job and not isinstance(job[key], str):
+                job[key] = str(job[key])
+        jobs.append(job)
+    return msgspec.convert(jobs, list[JobPosting])
+
+
 class Chain:
     def __init__(self):
         # Use Ollama instead of Groq
@@ -30,9 +59,9 @@ class Chain:
             res = json_parser.parse(res.content)
         except OutputParserException:
             raise OutputParserException("Context too big. Unable to parse jobs.")
-        return res if isinstance(res, list) else [res]
+        return to_job_postings(res)
 
-    def write_mail(self, job, links):
+    def _mail_chain(self):
         prompt_email = PromptTemplate.from_template("""
             ### JOB DESCRIPTION:
             {job_description}
@@ -50,10 +79,22 @@ class Chain:
             ### EMAIL (NO PREAMBLE):
 
             """)
-        chain_email = prompt_email | self.llm
-        res = chain_email.invoke({"job_description": str(job), "link_list": links})
+        return prompt_email | self.llm
+
+    def write_mail(self, job, links):
+        chain_email = self._mail_chain()
+        res = chain_email.invoke(
+            {"job_description": str(msgspec.to_builtins(job)), "link_list": links}
+        )
         return res.content
 
+    def stream_mail(self, job, links):
+        chain_email = self._mail_chain()
+        for chunk in chain_email.stream(
+            {"job_description": str(msgspec.to_builtins(job)), "link_list": links}
+        ):
+            yield chunk.content
+
 
 if __name__ == "__main__":
     # Test the chain
@@ -71,3 +112,15 @@ if __name__ == "__main__":
 
     email = chain.write_mail(sample_job, sample_links)
     print(email)
+
+    # Stream twice in a row from pool threads with the same Chain, as the app
+    # does for two submits in one server process
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for attempt in (1, 2):
+            streamed = executor.submit(
+                lambda: "".join(chain.stream_mail(sample_job, sample_links))
+            ).result()
+            assert streamed, f"Streaming attempt {attempt} returned no text"
+            print(f"Streaming attempt {attempt}: {len(streamed)} characters")
@@ -1,19 +1,148 @@
+import httpx
+import msgspec
 import streamlit as st
-from langchain_community.document_loaders import WebBaseLoader
-from typing import List, Dict, Optional
+from typing import List, Optional
 import logging
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import time
-from chains import Chain
+from urllib.parse import urlsplit, urlunsplit
+from cache import get_jobs, get_page, set_jobs, set_page
+from chains import Chain, JobPosting, to_job_postings
 from portfolio import Portfolio
-from utils import clean_text
+from utils import clean_text, extract_page_text, warmup
 
-# Configure logging
+# Configure logging; unknown LOG_LEVEL values fall back to INFO
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+if not isinstance(logging.getLevelName(LOG_LEVEL), int):
+    LOG_LEVEL = "INFO"
 logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    level=LOG_LEVEL,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent LLM requests when generating emails
+MAX_CONCURRENT_EMAILS = 5
+
+# Browser-like User-Agent; many career sites reject default client agents
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+_URL_RE = re.compile(r"^https?://\S+$", re.IGNORECASE)
+
+# Query parameters that only carry tracking data and never change page content
+_TRACKING_PARAMS = {"gclid", "fbclid"}
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name.startswith("utm_") or name in _TRACKING_PARAMS
+
+
+def _canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so that equivalent links share cache entries.
+
+    Lowercases the scheme and host, drops tracking query parameters and the
+    fragment, and leaves the remaining query string untouched.
+
+    Args:
+        url: The URL to normalize
+
+    Returns:
+        Canonical form of the URL
+    """
+    parts = urlsplit(url.strip())
+    query = "&".join(
+        param
+        for param in parts.query.split("&")
+        if param and not _is_tracking_param(param.split("=", 1)[0])
+    )
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path, query, "")
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _http_client() -> httpx.Client:
+    """Create the process-wide pooled HTTP client used for scraping."""
+    return httpx.Client(
+        http2=True,
+        timeout=10,
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
+
+
+def _load(url: str) -> str:
+    """
+    Fetch a page and return its job-relevant text.
+
+    Args:
+        url: The URL to fetch
+
+    Returns:
+        Page text, or an empty string if nothing could be extracted
+    """
+    response = _http_client().get(url)
+    response.raise_for_status()
+    return extract_page_text(response.text)
+
+
+def _extract_jobs(chain: Chain, cleaned_data: str) -> List[JobPosting]:
+    """Extract jobs from page text, reusing results cached on disk."""
+    cached = get_jobs(cleaned_data)
+    if cached is not None:
+        return to_job_postings(cached)
+
+    jobs = chain.extract_jobs(cleaned_data)
+    # Empty extractions are not cached so the next attempt reaches the LLM
+    if jobs:
+        set_jobs(cleaned_data, msgspec.to_builtins(jobs))
+    return jobs
+
+
+@st.cache_resource(show_spinner=False)
+def _get_components():
+    """Initialize and cache LLM chain and portfolio components once per process."""
+    try:
+        chain = Chain()
+        portfolio = Portfolio()
+        portfolio.load_portfolio()
+        warmup()
+        logger.info("Successfully initialized application components")
+        return chain, portfolio
+    except Exception as e:
+        logger.error("Failed to initialize components: %s", e)
+        raise
+
+
+def _warm_components():
+    """Populate the component cache; errors resurface on the request-time call."""
+    try:
+        _get_components()
+    except Exception:
+        pass
+
+
+@st.cache_resource(show_spinner=False)
+def _start_background_warmup():
+    """Start building components in a background thread, once per process."""
+    thread = threading.Thread(target=_warm_components, daemon=True)
+    thread.start()
+    return thread
+
+
+# Load the LLM chain and vector store while the user is still entering a URL
+_start_background_warmup()
+
 
 class ColdEmailApp:
     """
@@ -28,9 +157,8 @@ class ColdEmailApp:
     """
 
     def __init__(self):
-        """Initialize the application with required components."""
+        """Initialize the application and configure the page."""
         self.setup_page_config()
-        self.initialize_components()
 
     @staticmethod
     def setup_page_config():
@@ -42,19 +170,6 @@ class ColdEmailApp:
             initial_sidebar_state="expanded",
         )
 
-    @st.cache_resource
-    def initialize_components(_self):
-        """Initialize and cache LLM chain and portfolio components."""
-        try:
-            chain = Chain()
-            portfolio = Portfolio()
-            portfolio.load_portfolio()
-            logger.info("Successfully initialized application components")
-            return chain, portfolio
-        except Exception as e:
-            logger.error(f"Failed to initialize components: {str(e)}")
-            raise
-
     @staticmethod
     @st.cache_data(ttl=3600, show_spinner=False)
     def load_and_process_url(url: str) -> Optional[str]:
@@ -68,21 +183,26 @@ class ColdEmailApp:
             Cleaned text content or None if failed
         """
         try:
-            logger.info(f"Loading URL: {url}")
-            loader = WebBaseLoader([url])
-            page_data = loader.load()
+            cleaned_content = get_page(url)
+            if cleaned_content is not None:
+                logger.info("Loaded URL from disk cache: %s", url)
+                return cleaned_content
 
-            if not page_data:
-                logger.warning(f"No data loaded from URL: {url}")
+            logger.info("Loading URL: %s", url)
+            raw_content = _load(url)
+
+            if not raw_content:
+                logger.warning("No data loaded from URL: %s", url)
                 return None
 
-            raw_content = page_data[0].page_content
             cleaned_content = clean_text(raw_content)
-            logger.info(f"Successfully processed URL: {url}")
+            if cleaned_content:
+                set_page(url, cleaned_content)
+            logger.info("Successfully processed URL: %s", url)
             return cleaned_content
 
         except Exception as e:
-            logger.error(f"Error loading URL {url}: {str(e)}")
+            logger.error("Error loading URL %s: %s", url, e)
             return None
 
     # Render Sidebar in Streamlit
@@ -125,14 +245,8 @@ class ColdEmailApp:
                 "[![GitHub](https://img.shields.io/badge/GitHub-Profile-blue)](https://github.com/yourusername)"
             )
 
-    def render_main_interface(self, chain: Chain, portfolio: Portfolio):
-        """
-        Render the main application interface.
-
-        Args:
-            chain: Initialized Chain object for LLM operations
-            portfolio: Initialized Portfolio object for skill matching
-        """
+    def render_main_interface(self):
+        """Render the main application interface."""
         # Header
         st.title("📧 AI-Powered Cold Email Generator")
         st.markdown("""
@@ -170,13 +284,105 @@ class ColdEmailApp:
 
         # Processing section
         if submit_button:
-            if not url_input or not url_input.startswith(("http://", "https://")):
+            if not url_input or not _URL_RE.match(url_input.strip()):
                 st.error(
                     "⚠️ Please enter a valid URL starting with http:// or https://"
                 )
                 return
 
-            self.process_url(url_input, chain, portfolio)
+            with st.spinner("⚙️ Loading AI components..."):
+                chain, portfolio = _get_components()
+            self.process_url(_canonicalize_url(url_input), chain, portfolio)
+
+    @staticmethod
+    def generate_emails(
+        jobs: List[JobPosting], all_links: List[List], chain: Chain, email_slots: List
+    ) -> List[str]:
+        """
+        Generate cold emails for all jobs concurrently, streaming each into its slot.
+
+        The LLM calls stream on a bounded thread pool and hand their text back
+        through a queue, so Streamlit elements are only updated from the calling
+        script thread.
+
+        Args:
+            jobs: Extracted job postings
+            all_links: Portfolio links matched to each job
+            chain: Chain object for LLM operations
+            email_slots: Streamlit placeholders that display each email as it streams
+
+        Returns:
+            Generated emails, in the same order as jobs
+        """
+        updates = queue.Queue()
+
+        def _generate_one(idx: int, job: JobPosting, links: List) -> str:
+            email = ""
+            try:
+                for token in chain.stream_mail(job, links):
+                    email += token
+                    updates.put((idx, email))
+            finally:
+                # Sentinel: this job is finished, successfully or not
+                updates.put((idx, None))
+            return email
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_EMAILS) as executor:
+            futures = [
+                executor.submit(_generate_one, idx, job, links)
+                for idx, (job, links) in enumerate(zip(jobs, all_links))
+            ]
+
+            remaining = len(futures)
+            while remaining:
+                # Block for one update, then drain the backlog and redraw each
+                # slot once with its latest text
+                pending = [updates.get()]
+                while True:
+                    try:
+                        pending.append(updates.get_nowait())
+                    except queue.Empty:
+                        break
+
+                latest = {}
+                for idx, email in pending:
+                    if email is None:
+                        remaining -= 1
+                    else:
+                        latest[idx] = email
+                for idx, email in latest.items():
+                    email_slots[idx].code(email, language="markdown")
+
+        return [future.result() for future in futures]
+
+    @staticmethod
+    @st.fragment
+    def render_email_card(idx: int, email: str, payload: bytes, batch_ts: str):
+        """
+        Render a generated email with its action buttons.
+
+        Runs as a fragment, so button clicks rerun only this card.
+
+        Args:
+            idx: 1-based position of the job on the page
+            email: Generated email text
+            payload: UTF-8 encoded email offered for download
+            batch_ts: Timestamp shared by all download filenames in this batch
+        """
+        st.code(email, language="markdown")
+
+        # Action buttons
+        col1, col2, col3 = st.columns([1, 1, 4])
+        with col1:
+            st.download_button(
+                label="📥 Download",
+                data=payload,
+                file_name=f"cold_email_{idx}_{batch_ts}.txt",
+                mime="text/plain",
+            )
+        with col2:
+            if st.button(f"📋 Copy", key=f"copy_{idx}"):
+                st.toast("Email copied to clipboard!", icon="✅")
 
     def process_url(self, url: str, chain: Chain, portfolio: Portfolio):
         """
@@ -187,6 +393,9 @@ class ColdEmailApp:
             chain: Chain object for LLM operations
             portfolio: Portfolio object for skill matching
         """
+        show_raw_data = st.session_state.get("show_raw_data", False)
+        show_extraction = st.session_state.get("show_extraction", False)
+
         try:
             # Step 1: Load and process URL
             with st.spinner("🔄 Loading and analyzing job posting..."):
@@ -202,7 +411,7 @@ class ColdEmailApp:
                     return
 
                 # Show raw data if enabled
-                if st.session_state.get("show_raw_data", False):
+                if show_raw_data:
                     with st.expander("📄 Raw Scraped Data"):
                         st.text_area("Content", cleaned_data, height=200)
 
@@ -210,7 +419,7 @@ class ColdEmailApp:
                 st.info("🔍 Extracting job information...")
                 progress_bar.progress(66)
 
-                jobs = chain.extract_jobs(cleaned_data)
+                jobs = _extract_jobs(chain, cleaned_data)
 
                 if not jobs:
                     st.warning(
@@ -219,65 +428,57 @@ class ColdEmailApp:
                     return
 
                 progress_bar.progress(100)
-                time.sleep(0.3)
                 progress_bar.empty()
 
             # Step 3: Display results
             st.success(f"✅ Found {len(jobs)} job posting(s)!")
 
             # Show extraction details if enabled
-            if st.session_state.get("show_extraction", False):
+            if show_extraction:
                 with st.expander("🔍 Extracted Job Details"):
                     for idx, job in enumerate(jobs, 1):
-                        st.json(job)
+                        st.json(msgspec.to_builtins(job))
 
             # Step 4: Generate emails
             st.divider()
             st.subheader("📨 Generated Cold Emails")
 
+            all_links = portfolio.query_links_batch([job.skills for job in jobs])
+
+            email_slots = []
             for idx, job in enumerate(jobs, 1):
                 with st.container():
                     # Job header
                     col1, col2 = st.columns([3, 1])
                     with col1:
-                        st.markdown(f"### Email {idx}: {job.get('role', 'Position')}")
+                        st.markdown(f"### Email {idx}: {job.role or 'Position'}")
                     with col2:
-                        exp = job.get("experience", "N/A")
-                        st.metric("Experience", exp)
+                        st.metric("Experience", job.experience)
 
                     # Skills tags
-                    skills = job.get("skills", [])
+                    skills = job.skills
                     if skills:
-                        st.markdown("**Required Skills:**")
-                        skill_cols = st.columns(min(len(skills), 5))
-                        for i, skill in enumerate(skills[:5]):
-                            with skill_cols[i]:
-                                st.markdown(f"`{skill}`")
-
-                    # Generate email with loading
-                    with st.spinner(f"✍️ Generating personalized email {idx}..."):
-                        links = portfolio.query_links(skills)
-                        email = chain.write_mail(job, links)
-
-                    # Display email
-                    st.markdown("**Generated Email:**")
-                    st.code(email, language="markdown")
-
-                    # Action buttons
-                    col1, col2, col3 = st.columns([1, 1, 4])
-                    with col1:
-                        st.download_button(
-                            label="📥 Download",
-                            data=email,
-                            file_name=f"cold_email_{idx}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                            mime="text/plain",
+                        st.markdown(
+                            "**Required Skills:** "
+                            + " ".join(f"`{skill}`" for skill in skills[:5])
                         )
-                    with col2:
-                        if st.button(f"📋 Copy", key=f"copy_{idx}"):
-                            st.toast("Email copied to clipboard!", icon="✅")
+
+                    # Email is streamed into this slot once generation starts
+                    st.markdown("**Generated Email:**")
+                    email_slot = st.empty()
+                    email_slot.caption(f"✍️ Generating personalized email {idx}...")
+                    email_slots.append(email_slot)
 
                     st.divider()
 
+            emails = self.generate_emails(jobs, all_links, chain, email_slots)
+
+            batch_ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            for idx, (email, email_slot) in enumerate(zip(emails, email_slots), 1):
+                # Replace the streamed preview with the interactive card
+                with email_slot.container():
+                    self.render_email_card(idx, email, email.encode("utf-8"), batch_ts)
+
             # Update statistics
             st.session_state.generated_count += len(jobs)
 
@@ -286,19 +487,16 @@ class ColdEmailApp:
             st.success(f"🎉 Successfully generated {len(jobs)} personalized email(s)!")
 
         except Exception as e:
-            logger.error(f"Error processing URL: {str(e)}", exc_info=True)
+            logger.error("Error processing URL: %s", e, exc_info=True)
             st.error(f"❌ An error occurred: {str(e)}")
             st.info("💡 Try a different URL or check your internet connection.")
 
     def run(self):
         """Main application entry point."""
         try:
-            # Initialize components
-            chain, portfolio = self.initialize_components()
-
             # Render UI
             self.render_sidebar()
-            self.render_main_interface(chain, portfolio)
+            self.render_main_interface()
 
             # Footer
             st.markdown("---")
@@ -315,7 +513,7 @@ class ColdEmailApp:
             )
 
         except Exception as e:
-            logger.critical(f"Critical error in application: {str(e)}", exc_info=True)
+            logger.critical("Critical error in application: %s", e, exc_info=True)
             st.error(
                 "💥 Application failed to initialize. Please check logs and restart."
             )
@@ -1,14 +1,25 @@
 import pandas as pd
 import chromadb
+import threading
 import uuid
+from collections import OrderedDict
+from chromadb.utils import embedding_functions
+
+# Maximum number of skill embeddings kept in memory
+EMBEDDING_CACHE_SIZE = 4096
 
 
 class Portfolio:
     def __init__(self, file_path="app/resource/my_portfolio.csv"):
         self.file_path = file_path
         self.data = pd.read_csv(file_path)
+        self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
         self.chroma_client = chromadb.PersistentClient("vectorstore")
-        self.collection = self.chroma_client.get_or_create_collection(name="portfolio")
+        self.collection = self.chroma_client.get_or_create_collection(
+            name="portfolio", embedding_function=self.embedding_function
+        )
+        self._embedding_cache = OrderedDict()
+        self._embedding_lock = threading.Lock()
 
     # Portfolio Handling:
     def load_portfolio(self):
@@ -20,7 +31,45 @@ class Portfolio:
                     ids=[str(uuid.uuid4())],
                 )
 
+    # LRU cache of skill embeddings; only unseen skills hit the embedding model
+    def _embed(self, texts):
+        with self._embedding_lock:
+            misses = [t for t in dict.fromkeys(texts) if t not in self._embedding_cache]
+            if misses:
+                for text, embedding in zip(misses, self.embedding_function(misses)):
+                    self._embedding_cache[text] = embedding
+
+            embeddings = []
+            for text in texts:
+                self._embedding_cache.move_to_end(text)
+                embeddings.append(self._embedding_cache[text])
+
+            while len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+            return embeddings
+
     def query_links(self, skills):
-        return self.collection.query(query_texts=skills, n_results=2).get(
-            "metadatas", []
-        )
+        if isinstance(skills, str):
+            skills = [skills]
+        return self.collection.query(
+            query_embeddings=self._embed(skills), n_results=2
+        ).get("metadatas", [])
+
+    def query_links_batch(self, skills_lists):
+        # One vector search for every job's skills, split back per job
+        skills_lists = [
+            [skills] if isinstance(skills, str) else list(skills or [])
+            for skills in skills_lists
+        ]
+        query_texts = [skill for skills in skills_lists for skill in skills]
+        if not query_texts:
+            return [[] for _ in skills_lists]
+
+        metadatas = self.collection.query(
+            query_embeddings=self._embed(query_texts), n_results=2
+        ).get("metadatas", [])
+        links, offset = [], 0
+        for skills in skills_lists:
+            links.append(metadatas[offset : offset + len(skills)])
+            offset += len(skills)
+        return links
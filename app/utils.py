@@ -1,4 +1,38 @@
+import json
 import re
+from html import unescape
+
+import numpy as np
+from numba import njit
+from readability import Document
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
+
+# Readability output shorter than this is treated as a failed extraction
+MIN_READABLE_CHARS = 200
+
+# Body text up to this length is sent as-is; readability only runs on larger pages
+MAX_UNFILTERED_CHARS = 3000
+
+
+@njit(cache=True)
+def _clean_bytes(buf):
+    # Single pass over the encoded text: keep ASCII alphanumerics, turn runs
+    # of whitespace into one space and drop everything else.
+    out = np.empty_like(buf)
+    n = 0
+    pending_space = False
+    for c in buf:
+        if (48 <= c <= 57) or (65 <= c <= 90) or (97 <= c <= 122):
+            if pending_space:
+                out[n] = 32
+                n += 1
+                pending_space = False
+            out[n] = c
+            n += 1
+        elif c == 32 or (9 <= c <= 13):
+            # Leading whitespace is trimmed by never setting the flag at n == 0
+            pending_space = n > 0
+    return out[:n]
 
 
 # A simple text processing Pipeline :
@@ -11,12 +45,71 @@ def clean_text(text):
         "",
         text,
     )
-    # Remove special characters
-    text = re.sub(r"[^a-zA-Z0-9 ]", "", text)
-    # Replace multiple spaces with a single space
-    text = re.sub(r"\s{2,}", " ", text)
-    # Trim leading and trailing whitespace
-    text = text.strip()
-    # Remove extra whitespace
-    text = " ".join(text.split())
-    return text
+    # Remove special characters and collapse/trim whitespace
+    buf = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    return _clean_bytes(buf).tobytes().decode("ascii")
+
+
+def warmup():
+    # Compile (or load from the on-disk cache) the JIT kernel ahead of the first request
+    clean_text("warm up")
+
+
+def _tree_to_text(tree):
+    tree.strip_tags(["script", "style", "noscript"])
+    if tree.body is None:
+        return ""
+    return tree.body.text(separator=" ", strip=True)
+
+
+def _html_to_text(html):
+    return _tree_to_text(HTMLParser(html))
+
+
+def _iter_job_postings(data):
+    # Walk JSON-LD payloads, which may nest postings in lists or an @graph
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_job_postings(item)
+    elif isinstance(data, dict):
+        types = data.get("@type")
+        if types == "JobPosting" or (isinstance(types, list) and "JobPosting" in types):
+            yield data
+        elif "@graph" in data:
+            yield from _iter_job_postings(data["@graph"])
+
+
+def extract_page_text(html):
+    # Prefer structured JobPosting data, then the readable main content,
+    # and only fall back to the whole page body.
+    if not html.strip():
+        return ""
+
+    tree = HTMLParser(html)
+    postings = []
+    for node in tree.css('script[type="application/ld+json"]'):
+        try:
+            data = json.loads(node.text())
+        except ValueError:
+            continue
+        for posting in _iter_job_postings(data):
+            title = posting.get("title") or ""
+            # Descriptions are often entity-escaped HTML
+            description = _html_to_text(unescape(str(posting.get("description") or "")))
+            postings.append(f"{title} {description}".strip())
+    if any(postings):
+        return " ".join(postings)
+
+    # The JSON-LD scripts have been read, so the same tree can be stripped
+    body_text = _tree_to_text(tree)
+    if len(body_text) <= MAX_UNFILTERED_CHARS:
+        return body_text
+
+    try:
+        text = _html_to_text(Document(html).summary())
+    except Exception:
+        text = ""
+    if len(text) >= MIN_READABLE_CHARS:
+        return text
+
+    return body_text